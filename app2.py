@@ -1,9 +1,18 @@
+from __future__ import annotations
+
 import os
 import math
+import hashlib
+import hmac
+from functools import lru_cache
+from typing import TYPE_CHECKING
 import numpy as np
-import pandas as pd
 import streamlit as st
 
+# pandas는 결과 표/차트에서만 사용 → 해당 함수 안에서 지연 import (첫 화면 로딩 단축)
+if TYPE_CHECKING:
+    import pandas as pd
+
 # ============================================================
 # 전남 무화과 겨울재배 의사결정지원시스템 (Streamlit)
 # - 로그인 잠금(Secrets/ENV)
@@ -17,12 +26,14 @@ st.set_page_config(page_title="전남 무화과 경영 분석기", layout="wide"
 # -----------------------------
 # 0) 로그인(잠금) 설정
 # -----------------------------
+@lru_cache(maxsize=1)
 def get_password() -> str | None:
     """
     우선순위:
     1) Streamlit secrets: APP_PASSWORD
     2) 환경변수: APP_PASSWORD
     없으면 None (잠금 비활성)
+    ※ 프로세스당 1회만 조회 (비밀번호 변경 시 앱 재시작 필요)
     """
     pw = None
     try:
@@ -33,11 +44,19 @@ def get_password() -> str | None:
         pw = os.getenv("APP_PASSWORD")
     return pw
 
-def login_gate():
+@st.cache_resource(show_spinner=False)
+def _pw_hash() -> bytes | None:
+    """
+    설정된 비밀번호의 SHA-256 digest (프로세스당 1회 계산)
+    """
     pw = get_password()
+    return hashlib.sha256(pw.encode("utf-8")).digest() if pw else None
+
+def login_gate():
+    pw_hash = _pw_hash()
 
     # 비밀번호가 설정되지 않으면 잠금 비활성(연구소 내부 테스트용)
-    if not pw:
+    if pw_hash is None:
         st.info("ℹ️ APP_PASSWORD가 설정되어 있지 않아 로그인 없이 실행됩니다. (배포 시 secrets에 비밀번호 설정 권장)")
         return
 
@@ -55,7 +74,9 @@ def login_gate():
     c1, c2 = st.columns([1, 2])
     with c1:
         if st.button("로그인", use_container_width=True):
-            if password_input == pw:
+            # 평문 비교 대신 digest를 상수시간 비교
+            input_hash = hashlib.sha256(password_input.encode("utf-8")).digest()
+            if hmac.compare_digest(input_hash, pw_hash):
                 st.session_state["authenticated"] = True
                 st.rerun()
             else:
@@ -78,53 +99,96 @@ st.divider()
 # 2) 지역 간이 파라미터(초기값)
 #    ※ 향후 기상자료 기반 계수로 교체 가능
 # -----------------------------
-REGION_DATA = {
-    "영암군 (무화과 주산지)": {"base": 2.0, "amp": 8.0},
-    "해남군": {"base": 2.2, "amp": 7.8},
-    "목포시": {"base": 2.5, "amp": 7.5},
-    "신안군": {"base": 3.0, "amp": 7.0},
-    "진도군": {"base": 3.2, "amp": 6.8},
-    "완도군": {"base": 3.5, "amp": 6.5},
-    "무안군": {"base": 1.5, "amp": 8.2},
-    "강진군": {"base": 2.0, "amp": 8.0},
-    "장흥군": {"base": 1.8, "amp": 8.2},
-    "여수시": {"base": 3.0, "amp": 7.0},
-    "순천시": {"base": 1.5, "amp": 8.5},
-    "광양시": {"base": 2.0, "amp": 8.0},
-    "고흥군": {"base": 2.8, "amp": 7.2},
-    "보성군": {"base": 1.0, "amp": 8.5},
-    "나주시": {"base": 0.5, "amp": 9.0},
-    "담양군": {"base": -0.5, "amp": 9.5},
-    "곡성군": {"base": -1.0, "amp": 10.0},
-    "구례군": {"base": -0.5, "amp": 9.8},
-    "화순군": {"base": -1.0, "amp": 9.8},
-    "장성군": {"base": -0.5, "amp": 9.5},
-    "함평군": {"base": 1.0, "amp": 8.8},
-    "영광군": {"base": 1.0, "amp": 8.8},
-}
-
-U_VALUES = {
-    "비닐 1겹 (U=5.5)": 5.5,
-    "비닐 2겹 (U=4.5)": 4.5,
-    "다겹보온커튼 (U=2.0)": 2.0,
-    "고효율 패키지 (U=1.5)": 1.5,
-}
+# 읽기 전용 테이블: 재실행마다 다시 만들지 않도록 프로세스 단위로 공유
+@st.cache_resource(show_spinner=False)
+def get_region_table() -> tuple[tuple[str, ...], np.ndarray, np.ndarray]:
+    """
+    반환: (지역명, base 배열, amp 배열) — 같은 인덱스 순서
+    - 배열은 읽기 전용(프로세스 공유 객체)
+    - 다지역 비교 시 배열 그대로 벡터 연산에 사용
+    """
+    region_data = {
+        "영암군 (무화과 주산지)": {"base": 2.0, "amp": 8.0},
+        "해남군": {"base": 2.2, "amp": 7.8},
+        "목포시": {"base": 2.5, "amp": 7.5},
+        "신안군": {"base": 3.0, "amp": 7.0},
+        "진도군": {"base": 3.2, "amp": 6.8},
+        "완도군": {"base": 3.5, "amp": 6.5},
+        "무안군": {"base": 1.5, "amp": 8.2},
+        "강진군": {"base": 2.0, "amp": 8.0},
+        "장흥군": {"base": 1.8, "amp": 8.2},
+        "여수시": {"base": 3.0, "amp": 7.0},
+        "순천시": {"base": 1.5, "amp": 8.5},
+        "광양시": {"base": 2.0, "amp": 8.0},
+        "고흥군": {"base": 2.8, "amp": 7.2},
+        "보성군": {"base": 1.0, "amp": 8.5},
+        "나주시": {"base": 0.5, "amp": 9.0},
+        "담양군": {"base": -0.5, "amp": 9.5},
+        "곡성군": {"base": -1.0, "amp": 10.0},
+        "구례군": {"base": -0.5, "amp": 9.8},
+        "화순군": {"base": -1.0, "amp": 9.8},
+        "장성군": {"base": -0.5, "amp": 9.5},
+        "함평군": {"base": 1.0, "amp": 8.8},
+        "영광군": {"base": 1.0, "amp": 8.8},
+    }
+    names = tuple(region_data)
+    base_arr = np.array([v["base"] for v in region_data.values()])
+    amp_arr = np.array([v["amp"] for v in region_data.values()])
+    base_arr.flags.writeable = False
+    amp_arr.flags.writeable = False
+    return names, base_arr, amp_arr
+
+@st.cache_resource(show_spinner=False)
+def get_u_values() -> dict[str, float]:
+    return {
+        "비닐 1겹 (U=5.5)": 5.5,
+        "비닐 2겹 (U=4.5)": 4.5,
+        "다겹보온커튼 (U=2.0)": 2.0,
+        "고효율 패키지 (U=1.5)": 1.5,
+    }
+
+REGION_NAMES, REGION_BASE, REGION_AMP = get_region_table()
+U_VALUES = get_u_values()
+
 
 # -----------------------------
 # 3) 계산 함수들
 # -----------------------------
+# 일변화 코사인 항: 24시간 고정이므로 모듈 로드 시 1회 계산 (최고 14시 가정)
+# 상대비교용 간이모델이므로 float32로 충분 (브로드캐스트 버퍼 메모리 절반)
+# - 시즌 난방비 오차: 상대 ~3e-7 이하 (원 단위로는 수억 원 규모에서 최대 십수 원 차이)
+_HOUR_RAD = (np.arange(24) - 14) * (2 * np.pi / 24)
+COS_HOUR = np.cos(_HOUR_RAD).astype(np.float32)
+
+# 월별 출하 계수 (인덱스=월): 1월 0.8, 11·2월 1.1, 그 외 1.0
+MONTH_FACTOR = np.ones(13)
+MONTH_FACTOR[1] = 0.8
+MONTH_FACTOR[[2, 11]] = 1.1
+
+# 내용연수 역수 (피복재 3년, 보온커튼 5년, 난방기 10년, 기타 10년): 나눗셈 → 곱셈
+_INV_LIVES = (1 / 3, 1 / 5, 1 / 10, 1 / 10)
+
+def _winter_dates(start: str, end: str) -> np.ndarray:
+    """
+    겨울 작기 날짜 벡터 (datetime64[D]).
+    pd.date_range(DatetimeIndex) 대신 NumPy로 직접 생성
+    ※ 생성 비용(수 µs)이 캐시 조회(해시+역직렬화)보다 싸므로 캐시하지 않음
+    """
+    return np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+
 def greenhouse_surface_area(
     gh_width: float,
     gh_length: float,
     gh_side_h: float,
     gh_ridge_h: float,
     span_count: int,
-    gh_type: str,
 ) -> float:
     """
     외피면적 근사.
     - 지붕/마구리: 동수 반영
     - 측벽: 연동의 경우 내부벽 공유 → 외곽 측벽만(2면) 반영 (span_count 미반영)
+    - 단동/연동 구분은 span_count로만 반영
+    ※ sqrt 1회 + 사칙연산 몇 번이라 캐시 조회보다 직접 계산이 빠름 → 캐시하지 않음
     """
     roof_height = gh_ridge_h - gh_side_h
     roof_slope_len = math.sqrt((gh_width / 2) ** 2 + roof_height**2)
@@ -142,16 +206,25 @@ def greenhouse_surface_area(
 def annual_depreciation_won(cost_film: float, cost_curtain: float, cost_heater: float, cost_facility: float) -> int:
     """
     입력 단위: 만원
+    ※ 곱셈 4회라 캐시 조회보다 직접 계산이 빠름 → 캐시하지 않음
     """
-    d1 = cost_film / 3
-    d2 = cost_curtain / 5
-    d3 = cost_heater / 10
-    d4 = cost_facility / 10
-    return int((d1 + d2 + d3 + d4) * 10000)
+    return int(
+        (
+            cost_film * _INV_LIVES[0]
+            + cost_curtain * _INV_LIVES[1]
+            + cost_heater * _INV_LIVES[2]
+            + cost_facility * _INV_LIVES[3]
+        )
+        * 10000
+    )
 
-def simulate_outdoor_min_temp(base_t: float, amp_t: float, day_idx: int, days_total: int, scenario: str) -> float:
+def simulate_outdoor_min_temp(
+    base_t: float | np.ndarray, amp_t: float | np.ndarray, day_idx: np.ndarray, days_total: int, scenario: str
+) -> np.ndarray:
     """
     간이 계절변화: sin(반주기) 기반 '최저기온' 근사.
+    - day_idx(일 인덱스 배열) → 일별 최저기온 벡터 (스칼라 경로 없음)
+    - base_t/amp_t에 (지역, 1) 배열을 넘기면 (지역, days) 행렬
     - scenario:
       * "평년": 기본값
       * "한파(보수적)": 최저기온을 추가로 낮춰 리스크 반영(랜덤 없이 결정적)
@@ -162,15 +235,139 @@ def simulate_outdoor_min_temp(base_t: float, amp_t: float, day_idx: int, days_to
         seasonal -= 3.0  # 보수적 하향(필요 시 조정)
     return seasonal
 
-def diurnal_temp_curve(min_t: float, max_t: float, hour: int) -> float:
+def diurnal_temp_curve(min_t: np.ndarray, max_t: np.ndarray) -> np.ndarray:
     """
     일변화: 코사인 곡선 (최고 14시 가정)
     T(hour) = (min+max)/2 + (max-min)/2 * cos((hour-14)*2π/24)
+    - 0~23시 전체를 COS_HOUR와 브로드캐스팅 (런타임 삼각함수 계산 없음)
+    - 반환 shape: min_t.shape + (24,)  예: (days,) → (days, 24)
     """
-    omega = 2 * np.pi / 24
-    return (min_t + max_t) / 2 + (max_t - min_t) / 2 * np.cos((hour - 14) * omega)
+    min_t = min_t[..., None]
+    max_t = max_t[..., None]
+    return (min_t + max_t) / 2 + (max_t - min_t) / 2 * COS_HOUR
 
-def winter_heating_cost_won(
+def daily_heating_load(
+    min_t: np.ndarray,
+    max_t: np.ndarray,
+    target_temp: float,
+    ua: float,
+    heating_model: str,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    일별 난방부하 커널 (Streamlit/pandas 비의존, 순수 NumPy).
+    - ua: 외피면적 × U값 (호출 측에서 1회 계산)
+    - min_t/max_t: (days,) 또는 (지역, days)
+    반환: (일별 난방부하, 일별 가온시간) — 입력 min_t와 같은 shape
+    """
+    if heating_model == "간이(14시간)":
+        # 최저기온 기준 14시간 고정 가정
+        delta_t = np.clip(target_temp - min_t, 0.0, None)
+        daily_load = delta_t * (ua * 14.0)
+        hours_active = np.where(delta_t > 0, 14, 0)
+    else:
+        # 정밀 24시간: (days, 24) 시간별 외기온을 한 번에 계산
+        out_t = diurnal_temp_curve(min_t, max_t)
+        # (days, 24) 임시배열을 추가로 만들지 않도록 같은 버퍼에서 in-place 계산
+        delta_t = np.subtract(target_temp, out_t, out=out_t)
+        np.maximum(delta_t, 0.0, out=delta_t)
+        daily_load = ua * delta_t.sum(axis=-1)
+        hours_active = (delta_t > 0).sum(axis=-1)
+
+    return daily_load, hours_active
+
+    if heating_model == "간이(14시간)":
+        # 최저기온 기준 14시간 고정 가정
+        daily_load[active] = (target_temp - min_t[active]) * (ua * 14.0)
+        hours_active[active] = 14
+    else:
+        # 정밀 24시간: (가온일, 24) 시간별 외기온을 한 번에 계산
+        out_t = diurnal_temp_curve(min_t[active], max_t[active])
+        # (days, 24) 임시배열을 추가로 만들지 않도록 같은 버퍼에서 in-place 계산
+        delta_t = np.subtract(target_temp, out_t, out=out_t)
+        np.maximum(delta_t, 0.0, out=delta_t)
+        daily_load[active] = ua * delta_t.sum(axis=1)
+        hours_active[active] = (delta_t > 0).sum(axis=1)
+
+    return daily_load, hours_active
+
+def heating_cost_by_region(
+    surface_area: float,
+    u_val: float,
+    target_temp: float,
+    unit_fuel_cost: float,
+    energy_source: str,
+    region_base: float | np.ndarray,
+    region_amp: float | np.ndarray,
+    days_total: int,
+    heating_model: str,
+    scenario: str,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    겨울 난방비를 지역 축까지 브로드캐스팅해 한 번에 계산.
+    - region_base/region_amp: (지역,) 배열 또는 스칼라(1개 지역)
+    - 기온 행렬 (지역, days) → 정밀모델은 내부에서 (지역, days, 24)
+    반환: (지역별 난방비 원, 지역별 평균 가온시간(시간/일)) — 각각 (지역,)
+    """
+    base = np.atleast_1d(region_base)[:, None]
+    amp = np.atleast_1d(region_amp)[:, None]
+    if days_total == 0:
+        return np.zeros(len(base)), np.zeros(len(base))
+
+    eff = 0.85 if energy_source == "면세유(경유)" else 0.98
+    calorific = 8500 if energy_source == "면세유(경유)" else 860  # 간이값(상대비교 기반)
+
+    # 루프 불변 상수: 외피 열손실계수(UA), 난방부하 → 연료비(원) 환산계수
+    ua = surface_area * u_val
+    won_per_load = unit_fuel_cost / (calorific * eff) if (calorific * eff) > 0 else 0.0
+
+    # 일별 최저/최고기온 행렬 (지역, days)
+    day_idx = np.arange(days_total)
+    min_t = simulate_outdoor_min_temp(base, amp, day_idx, days_total, scenario).astype(np.float32)
+
+    # max_t는 간이 일교차(고정)로 설정
+    # 추후 실측 기반 월별/지역별 일교차로 치환 가능
+    max_t = min_t + 10.0
+
+    daily_load, hours_active = daily_heating_load(min_t, max_t, target_temp, ua, heating_model)
+
+    # 일별 값은 float32, 시즌 합계는 float64로 누적 (원 단위 절사는 호출 측에서 1회)
+    fuel_cost = daily_load.sum(axis=1, dtype=np.float64) * won_per_load
+    avg_hours = hours_active.sum(axis=1, dtype=np.int64) / days_total
+    return fuel_cost, avg_hours
+
+@st.cache_data(show_spinner=False)
+def region_heating_ranking(
+    surface_area: float,
+    u_val: float,
+    target_temp: float,
+    unit_fuel_cost: float,
+    energy_source: str,
+    start: str = "2025-11-01",
+    end: str = "2026-02-28",
+    heating_model: str = "정밀(24시간)",
+    scenario: str = "평년",
+) -> pd.DataFrame:
+    """
+    동일 온실·설정으로 전남 전 시·군의 겨울 난방비를 1회 계산해 난방비 순으로 정렬.
+    """
+    import pandas as pd
+
+    days_total = len(_winter_dates(start, end))
+    fuel_cost, avg_hours = heating_cost_by_region(
+        surface_area, u_val, target_temp, unit_fuel_cost, energy_source,
+        REGION_BASE, REGION_AMP, days_total, heating_model, scenario,
+    )
+    ranking = pd.DataFrame(
+        {
+            "시·군": REGION_NAMES,
+            "난방비(만원)": np.round(fuel_cost / 10000),
+            "평균 가동시간(시간/일)": np.round(avg_hours, 1),
+        }
+    )
+    return ranking.sort_values("난방비(만원)", ignore_index=True)
+
+@st.cache_data(show_spinner=False)
+def winter_simulate(
     surface_area: float,
     u_val: float,
     target_temp: float,
@@ -178,131 +375,116 @@ def winter_heating_cost_won(
     energy_source: str,
     region_base: float,
     region_amp: float,
+    winter_total_yield: float,
+    market_price: float,
     start: str = "2025-11-01",
     end: str = "2026-02-28",
     heating_model: str = "정밀(24시간)",
     scenario: str = "평년",
-) -> tuple[int, float]:
+) -> tuple[int, float, int]:
     """
-    반환: (난방비 원, 평균 가온시간(시간/일))
+    겨울 작기 통합 계산: 날짜·월·기온 벡터를 1회 만들어 난방비/매출에 공유.
+    반환: (난방비 원, 평균 가온시간(시간/일), 겨울 매출 원)
     """
-    dates = pd.date_range(start, end)
+    dates = _winter_dates(start, end)
     days_total = len(dates)
+    if days_total == 0:
+        return 0, 0.0, 0
 
-    eff = 0.85 if energy_source == "면세유(경유)" else 0.98
-    calorific = 8500 if energy_source == "면세유(경유)" else 860  # 간이값(상대비교 기반)
+    # --- 난방비 ---
+    fuel_cost, hours = heating_cost_by_region(
+        surface_area, u_val, target_temp, unit_fuel_cost, energy_source,
+        region_base, region_amp, days_total, heating_model, scenario,
+    )
+    total_cost = float(fuel_cost[0])
+    avg_hours = float(hours[0])
+
+    # --- 매출: 월별 출하 계수 (datetime64[D] → 월 추출을 C 레벨 캐스팅으로 처리) ---
+    months = dates.astype("datetime64[M]").astype(int) % 12 + 1
+    daily_base_yield = winter_total_yield / days_total
+    revenue = (daily_base_yield * MONTH_FACTOR[months] * market_price).sum()
 
-    total_cost = 0.0
-    total_hours = 0.0
-
-    for i, _date in enumerate(dates):
-        min_t = simulate_outdoor_min_temp(region_base, region_amp, i, days_total, scenario)
-
-        # max_t는 간이 일교차(고정)로 설정
-        # 추후 실측 기반 월별/지역별 일교차로 치환 가능
-        max_t = min_t + 10.0
-
-        daily_load = 0.0
-        hours_active = 0
-
-        if heating_model == "간이(14시간)":
-            # 최저기온 기준 14시간 고정 가정
-            delta_t = max(target_temp - min_t, 0.0)
-            daily_load = surface_area * u_val * delta_t * 14.0
-            hours_active = 14 if delta_t > 0 else 0
-        else:
-            # 정밀 24시간: 시간별 판단
-            for hour in range(24):
-                out_t = diurnal_temp_curve(min_t, max_t, hour)
-                if out_t < target_temp:
-                    delta_t = target_temp - out_t
-                    daily_load += surface_area * u_val * delta_t * 1.0
-                    hours_active += 1
-
-        needed_fuel = daily_load / (calorific * eff) if (calorific * eff) > 0 else 0
-        total_cost += needed_fuel * unit_fuel_cost
-        total_hours += hours_active
-
-    avg_hours = total_hours / days_total if days_total > 0 else 0
-    return int(total_cost), float(avg_hours)
-
-def winter_revenue_won(winter_total_yield: float, market_price: float, start="2025-11-01", end="2026-02-28") -> int:
-    dates = pd.date_range(start, end)
-    days = len(dates)
-    if days == 0:
-        return 0
-
-    daily_base_yield = winter_total_yield / days
-    revenue = 0.0
-    for d in dates:
-        season_factor = 1.0
-        if d.month == 1:
-            season_factor = 0.8
-        elif d.month in (11, 2):
-            season_factor = 1.1
-        revenue += daily_base_yield * season_factor * market_price
-    return int(revenue)
+    return int(total_cost), avg_hours, int(revenue)
 
 # -----------------------------
 # 4) 입력 UI
 # -----------------------------
+# 연료별 기본 단가 (원) — 연료 선택 시 연료 단가 입력의 초기값
+FUEL_DEFAULT_PRICE = {"면세유(경유)": 1100, "농사용 전기": 50}
+
+def sync_widget_default(key: str, default: float) -> None:
+    """
+    key 위젯의 기본값을 session_state로 설정.
+    - 사용자가 바꾸지 않은 값(직전 기본값과 동일)일 때만 새 기본값으로 교체
+    - 사용자가 입력한 값은 선택지가 바뀌어도 유지
+    """
+    default_key = f"_{key}_default"
+    if key not in st.session_state or st.session_state[key] == st.session_state.get(default_key):
+        st.session_state[key] = default
+    st.session_state[default_key] = default
+
 with st.sidebar:
     st.header("📝 데이터 입력")
     st.info("입력 후 맨 아래 버튼을 누르세요.")
 
-    # 0. 지역
-    with st.expander("0. 지역 선택", expanded=True):
-        region_name = st.selectbox("전남 시·군 선택", list(REGION_DATA.keys()))
-
-    # 1. 온실 규격
-    with st.expander("1. 온실 규격", expanded=False):
-        gh_type = st.radio("온실 형태", ["단동 (1동)", "연동"], horizontal=True)
-        span_count = st.number_input("연동 수", value=1 if gh_type == "단동 (1동)" else 3, step=1, min_value=1)
-        gh_width = st.number_input("폭 (m)", value=6.0, step=0.5, min_value=1.0)
-        gh_length = st.number_input("길이 (m)", value=50.0, step=1.0, min_value=1.0)
-        gh_side_h = st.number_input("측고 (m)", value=2.0, step=0.2, min_value=0.5)
-        gh_ridge_h = st.number_input("동고 (m)", value=3.5, step=0.2, min_value=1.0)
-
-        floor_area_m2 = gh_width * gh_length * span_count
-        floor_area_py = floor_area_m2 / 3.3
-        st.caption(f"바닥면적: {floor_area_m2:,.0f} ㎡ (약 {floor_area_py:,.1f} 평)")
-
-    # 2. 연간 생산 계획
-    with st.expander("2. 연간 생산 계획", expanded=False):
-        st.markdown("**🌞 여름 작기**")
-        summer_total_yield = st.number_input("여름 총 생산량 (kg)", value=3000, step=100, min_value=0)
-        summer_price = st.number_input("여름 평균 단가 (원/kg)", value=6000, step=500, min_value=0)
-        summer_cost_ratio = st.slider("여름철 경영비 비율 (%)", 10, 80, 30)
-
-        st.markdown("---")
-        st.markdown("**⛄ 겨울 작기**")
-        winter_total_yield = st.number_input("겨울 예상 생산량 (kg)", value=1200, step=100, min_value=0)
-        market_price = st.number_input("겨울 예상 단가 (원/kg)", value=18000, step=1000, min_value=0)
-
-    # 3. 시설투자비
-    with st.expander("3. 시설투자비(만원)", expanded=False):
-        cost_film = st.number_input("피복비닐 (3년, 만원)", value=200, step=50, min_value=0)
-        cost_curtain = st.number_input("보온커튼 (5년, 만원)", value=1500, step=100, min_value=0)
-        cost_heater = st.number_input("난방기 (10년, 만원)", value=500, step=100, min_value=0)
-        cost_facility = st.number_input("기타 설비 (10년, 만원)", value=300, step=100, min_value=0)
-
-    # 4. 에너지/모델 설정
-    with st.expander("4. 에너지·모델 설정", expanded=False):
-        energy_source = st.selectbox("사용 연료", ["면세유(경유)", "농사용 전기"])
-        unit_fuel_cost = st.number_input(
-            "연료 단가 (원)",
-            value=1100 if energy_source == "면세유(경유)" else 50,
-            min_value=0,
-        )
-        target_temp = st.slider("목표 온도 (℃)", 8, 22, 15)
-
-        insul_type = st.selectbox("보온 등급", list(U_VALUES.keys()))
-
-        heating_model = st.radio("난방 모델", ["정밀(24시간)", "간이(14시간)"], horizontal=True)
-        scenario = st.selectbox("기상 시나리오", ["평년", "한파(보수적)"])
-
-    st.write("---")
-    submit_btn = st.button("🚜 연간 분석 실행", type="primary", use_container_width=True)
+    # 다른 입력의 기본값을 정하는 선택지는 폼 밖에 둠 → 바꾸는 즉시 연동 수/연료 단가 기본값 갱신
+    gh_type = st.radio("온실 형태", ["단동 (1동)", "연동"], horizontal=True)
+    energy_source = st.selectbox("사용 연료", list(FUEL_DEFAULT_PRICE.keys()))
+
+    # 의존 입력은 고정 key로 만들고 기본값은 session_state로 주입
+    # (value=가 바뀌면 위젯이 새로 생성되어 사용자가 입력한 값이 초기화되므로)
+    sync_widget_default("span_count", 1 if gh_type == "단동 (1동)" else 3)
+    sync_widget_default("unit_fuel_cost", FUEL_DEFAULT_PRICE[energy_source])
+
+    # 폼 안의 위젯은 값을 바꿔도 재실행되지 않고, 실행 버튼을 눌렀을 때만 1회 재실행
+    with st.form("inputs", clear_on_submit=False):
+        # 0. 지역
+        with st.expander("0. 지역 선택", expanded=True):
+            region_name = st.selectbox("전남 시·군 선택", REGION_NAMES)
+
+        # 1. 온실 규격
+        with st.expander("1. 온실 규격", expanded=False):
+            span_count = st.number_input("연동 수", step=1, min_value=1, key="span_count")
+            gh_width = st.number_input("폭 (m)", value=6.0, step=0.5, min_value=1.0)
+            gh_length = st.number_input("길이 (m)", value=50.0, step=1.0, min_value=1.0)
+            gh_side_h = st.number_input("측고 (m)", value=2.0, step=0.2, min_value=0.5)
+            gh_ridge_h = st.number_input("동고 (m)", value=3.5, step=0.2, min_value=1.0)
+
+            floor_area_m2 = gh_width * gh_length * span_count
+            floor_area_py = floor_area_m2 / 3.3
+            st.caption(f"바닥면적: {floor_area_m2:,.0f} ㎡ (약 {floor_area_py:,.1f} 평)")
+
+        # 2. 연간 생산 계획
+        with st.expander("2. 연간 생산 계획", expanded=False):
+            st.markdown("**🌞 여름 작기**")
+            summer_total_yield = st.number_input("여름 총 생산량 (kg)", value=3000, step=100, min_value=0)
+            summer_price = st.number_input("여름 평균 단가 (원/kg)", value=6000, step=500, min_value=0)
+            summer_cost_ratio = st.slider("여름철 경영비 비율 (%)", 10, 80, 30)
+
+            st.markdown("---")
+            st.markdown("**⛄ 겨울 작기**")
+            winter_total_yield = st.number_input("겨울 예상 생산량 (kg)", value=1200, step=100, min_value=0)
+            market_price = st.number_input("겨울 예상 단가 (원/kg)", value=18000, step=1000, min_value=0)
+
+        # 3. 시설투자비
+        with st.expander("3. 시설투자비(만원)", expanded=False):
+            cost_film = st.number_input("피복비닐 (3년, 만원)", value=200, step=50, min_value=0)
+            cost_curtain = st.number_input("보온커튼 (5년, 만원)", value=1500, step=100, min_value=0)
+            cost_heater = st.number_input("난방기 (10년, 만원)", value=500, step=100, min_value=0)
+            cost_facility = st.number_input("기타 설비 (10년, 만원)", value=300, step=100, min_value=0)
+
+        # 4. 에너지/모델 설정
+        with st.expander("4. 에너지·모델 설정", expanded=False):
+            unit_fuel_cost = st.number_input("연료 단가 (원)", min_value=0, key="unit_fuel_cost")
+            target_temp = st.slider("목표 온도 (℃)", 8, 22, 15)
+
+            insul_type = st.selectbox("보온 등급", list(U_VALUES.keys()))
+
+            heating_model = st.radio("난방 모델", ["정밀(24시간)", "간이(14시간)"], horizontal=True)
+            scenario = st.selectbox("기상 시나리오", ["평년", "한파(보수적)"])
+
+        st.write("---")
+        submit_btn = st.form_submit_button("🚜 연간 분석 실행", type="primary", use_container_width=True)
 
 # -----------------------------
 # 5) 계산 및 출력
@@ -313,16 +495,15 @@ if not submit_btn:
 
 # A) 공통 계산
 u_val = U_VALUES[insul_type]
-surface_area = greenhouse_surface_area(gh_width, gh_length, gh_side_h, gh_ridge_h, span_count, gh_type)
+surface_area = greenhouse_surface_area(gh_width, gh_length, gh_side_h, gh_ridge_h, span_count)
 depreciation = annual_depreciation_won(cost_film, cost_curtain, cost_heater, cost_facility)
 
-region_info = REGION_DATA[region_name]
-base_t = region_info["base"]
-amp_t = region_info["amp"]
+region_idx = REGION_NAMES.index(region_name)
+base_t = float(REGION_BASE[region_idx])
+amp_t = float(REGION_AMP[region_idx])
 
 # B) 겨울
-winter_revenue = winter_revenue_won(winter_total_yield, market_price)
-winter_fuel_cost, avg_hours = winter_heating_cost_won(
+winter_fuel_cost, avg_hours, winter_revenue = winter_simulate(
     surface_area=surface_area,
     u_val=u_val,
     target_temp=target_temp,
@@ -330,6 +511,8 @@ winter_fuel_cost, avg_hours = winter_heating_cost_won(
     energy_source=energy_source,
     region_base=base_t,
     region_amp=amp_t,
+    winter_total_yield=winter_total_yield,
+    market_price=market_price,
     heating_model=heating_model,
     scenario=scenario,
 )
@@ -343,72 +526,121 @@ summer_net_profit = summer_revenue - summer_cost
 total_annual_revenue = summer_revenue + winter_revenue
 total_annual_profit = summer_net_profit + winter_net_profit
 
+# D) 전남 시·군 비교 (지역만 바꾸고 나머지 조건 동일)
+region_ranking = region_heating_ranking(
+    surface_area=surface_area,
+    u_val=u_val,
+    target_temp=target_temp,
+    unit_fuel_cost=unit_fuel_cost,
+    energy_source=energy_source,
+    heating_model=heating_model,
+    scenario=scenario,
+)
+
 # -----------------------------
 # 6) 결과 출력(UI)
 # -----------------------------
-st.header(f"📊 연간 경영 분석 리포트 ({region_name})")
+# 차트용 소형 DataFrame: 같은 금액이면 재생성하지 않음
+@st.cache_data(show_spinner=False)
+def _rev_df(summer_revenue: float, winter_revenue: float) -> pd.DataFrame:
+    import pandas as pd
 
-st.subheader("🏠 온실/모델 요약")
-c1, c2, c3, c4 = st.columns(4)
-c1.metric("바닥면적", f"{floor_area_m2:,.0f} ㎡")
-c2.metric("외피면적(근사)", f"{surface_area:,.0f} ㎡")
-c3.metric("보온(U)", f"{u_val:.1f}")
-c4.metric("난방모델", f"{heating_model} / {scenario}")
+    return pd.DataFrame({"계절": ["여름 작기", "겨울 작기"], "매출액": [summer_revenue, winter_revenue]}).set_index("계절")
 
-st.caption(f"평균 난방 가동시간(추정): **{avg_hours:.1f} 시간/일**")
+@st.cache_data(show_spinner=False)
+def _cost_df(summer_cost: float, winter_fuel_cost: float, depreciation: float) -> pd.DataFrame:
+    import pandas as pd
 
-st.divider()
+    return pd.DataFrame(
+        {"항목": ["여름 경영비", "겨울 난방비", "시설 감가상각비"], "금액": [summer_cost, winter_fuel_cost, depreciation]}
+    ).set_index("항목")
 
-# 1. 겨울
-st.subheader("❄️ 1. 겨울 재배 투자 성적표")
-col1, col2, col3 = st.columns(3)
-col1.metric("겨울 매출", f"{winter_revenue/10000:,.0f} 만원")
-col2.metric("겨울 비용(난방+상각)", f"{(winter_fuel_cost+depreciation)/10000:,.0f} 만원")
-col3.metric(
-    "겨울 순이익",
-    f"{winter_net_profit/10000:,.0f} 만원",
-    delta="투자 성공" if winter_net_profit > 0 else "투자 주의",
-)
+# 결과 화면은 fragment로 분리: 이후 상호작용(QR 입력 등)이 분석 계산을 다시 돌리지 않음
+@st.fragment
+def _render_report(
+    *,
+    region_name: str,
+    floor_area_m2: float,
+    surface_area: float,
+    u_val: float,
+    heating_model: str,
+    scenario: str,
+    avg_hours: float,
+    winter_revenue: float,
+    winter_fuel_cost: float,
+    depreciation: float,
+    winter_net_profit: float,
+    summer_revenue: float,
+    summer_cost: float,
+    summer_net_profit: float,
+    total_annual_revenue: float,
+    total_annual_profit: float,
+    region_ranking: pd.DataFrame,
+):
+    st.header(f"📊 연간 경영 분석 리포트 ({region_name})")
+
+    st.subheader("🏠 온실/모델 요약")
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("바닥면적", f"{floor_area_m2:,.0f} ㎡")
+    c2.metric("외피면적(근사)", f"{surface_area:,.0f} ㎡")
+    c3.metric("보온(U)", f"{u_val:.1f}")
+    c4.metric("난방모델", f"{heating_model} / {scenario}")
+
+    st.caption(f"평균 난방 가동시간(추정): **{avg_hours:.1f} 시간/일**")
+
+    st.divider()
+
+    # 1. 겨울
+    st.subheader("❄️ 1. 겨울 재배 투자 성적표")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("겨울 매출", f"{winter_revenue/10000:,.0f} 만원")
+    col2.metric("겨울 비용(난방+상각)", f"{(winter_fuel_cost+depreciation)/10000:,.0f} 만원")
+    col3.metric(
+        "겨울 순이익",
+        f"{winter_net_profit/10000:,.0f} 만원",
+        delta="투자 성공" if winter_net_profit > 0 else "투자 주의",
+    )
 
-# 2. 연간
-st.subheader("📅 2. 연간 총 소득 (여름 + 겨울)")
-c1, c2, c3 = st.columns(3)
-c1.metric("연간 총 매출", f"{total_annual_revenue/10000:,.0f} 만원")
-c2.metric("연간 총 순이익", f"{total_annual_profit/10000:,.0f} 만원")
-c3.metric("겨울 기여(순이익)", f"{winter_net_profit/10000:,.0f} 만원")
+    # 2. 연간
+    st.subheader("📅 2. 연간 총 소득 (여름 + 겨울)")
+    c1, c2, c3 = st.columns(3)
+    c1.metric("연간 총 매출", f"{total_annual_revenue/10000:,.0f} 만원")
+    c2.metric("연간 총 순이익", f"{total_annual_profit/10000:,.0f} 만원")
+    c3.metric("겨울 기여(순이익)", f"{winter_net_profit/10000:,.0f} 만원")
 
-st.write("---")
-st.subheader("💰 소득 구조 시각화")
+    st.write("---")
+    st.subheader("💰 소득 구조 시각화")
 
-chart_col1, chart_col2 = st.columns(2)
+    chart_col1, chart_col2 = st.columns(2)
 
-with chart_col1:
-    st.caption("계절별 매출 비중")
-    df_rev = pd.DataFrame({"계절": ["여름 작기", "겨울 작기"], "매출액": [summer_revenue, winter_revenue]}).set_index("계절")
-    st.bar_chart(df_rev)
+    with chart_col1:
+        st.caption("계절별 매출 비중")
+        st.bar_chart(_rev_df(summer_revenue, winter_revenue))
 
-with chart_col2:
-    st.caption("비용 구조 분석")
-    df_cost = pd.DataFrame(
-        {"항목": ["여름 경영비", "겨울 난방비", "시설 감가상각비"], "금액": [summer_cost, winter_fuel_cost, depreciation]}
-    ).set_index("항목")
-    st.bar_chart(df_cost)
+    with chart_col2:
+        st.caption("비용 구조 분석")
+        st.bar_chart(_cost_df(summer_cost, winter_fuel_cost, depreciation))
+
+    st.write("---")
+    st.subheader("🗺️ 3. 전남 시·군 난방비 비교 (동일 조건)")
+    st.caption("지역만 바꿔 같은 온실·설정으로 계산한 겨울 난방비입니다. 열 제목을 눌러 정렬할 수 있습니다.")
+    st.dataframe(region_ranking, hide_index=True, use_container_width=True)
 
-st.success(
-    f"""
+    st.success(
+        f"""
 **📢 최종 진단**
 - 여름 순이익: **{int(summer_net_profit/10000):,}만원**
 - 겨울 순이익: **{int(winter_net_profit/10000):,}만원**
 - 연간 총 순이익: **{int(total_annual_profit/10000):,}만원**
 """
-)
+    )
 
-st.write("---")
-with st.expander("📚 분석 근거 및 데이터 출처 보기 (Reference)"):
-    st.markdown(
-        """
+    st.write("---")
+    with st.expander("📚 분석 근거 및 데이터 출처 보기 (Reference)"):
+        st.markdown(
+            """
 ### 1) 기상 데이터(현 버전)
-- 본 앱의 REGION_DATA(base/amp)는 **간이 비교용 파라미터**입니다.
+- 본 앱의 지역 파라미터(base/amp)는 **간이 비교용 파라미터**입니다.
 - 2026년 과제에서는 기상자료(예: 10년치 시간별 기온) 기반으로 지역·월별 계수를 도출하여 고도화합니다.
 
 ### 2) 난방부하 산정 개념
@@ -424,13 +656,38 @@ with st.expander("📚 분석 근거 및 데이터 출처 보기 (Reference)"):
 - 정액법: 피복재(3년), 보온커튼(5년), 난방기/기타(10년)
 - 입력 단위: 만원 → 원화 환산 후 연간 상각
 """
-    )
+        )
+
+_render_report(
+    region_name=region_name,
+    floor_area_m2=floor_area_m2,
+    surface_area=surface_area,
+    u_val=u_val,
+    heating_model=heating_model,
+    scenario=scenario,
+    avg_hours=avg_hours,
+    winter_revenue=winter_revenue,
+    winter_fuel_cost=winter_fuel_cost,
+    depreciation=depreciation,
+    winter_net_profit=winter_net_profit,
+    summer_revenue=summer_revenue,
+    summer_cost=summer_cost,
+    summer_net_profit=summer_net_profit,
+    total_annual_revenue=total_annual_revenue,
+    total_annual_profit=total_annual_profit,
+    region_ranking=region_ranking,
+)
 
 # QR (선택)
-with st.sidebar:
+@st.fragment
+def _qr_widget():
+    """URL 입력이 바뀌면 이 fragment만 재실행 (분석 결과 화면 유지)"""
     st.write("---")
     st.markdown("**📱 모바일로 접속하기(선택)**")
     qr_data = st.text_input("앱 URL(선택)", value="", help="배포 후 Streamlit URL을 넣으면 QR이 생성됩니다.")
     if qr_data.strip():
         qr_url = f"https://api.qrserver.com/v1/create-qr-code/?size=150x150&data={qr_data.strip()}"
         st.image(qr_url, caption="카메라로 스캔하세요")
+
+with st.sidebar:
+    _qr_widget()